@@ -44,7 +44,8 @@ def test_functionality(remote_sample, tmp_path):
     patch = reader.read_bounds(
         (0, 0, 252, 252), resolution=0.25, units="mpp", coord_space="resolution"
     )
-    patch = MicroNet.preproc(patch)
+    # The raw uint8 patch is fed directly; per image standardisation
+    # now happens batched on the device inside infer_batch.
     batch = torch.from_numpy(patch)[None]
     model = MicroNet()
     fetch_pretrained_weights("micronet-consep", f"{tmp_path}/weights.pth")
@@ -62,6 +63,22 @@ def test_value_error():
         _ = MicroNet(num_class=1)
 
 
+def test_use_checkpointing():
+    """Smoke test a training forward/backward with checkpointing on."""
+    model = MicroNet(use_checkpointing=True)
+    model.train()
+    output = model(torch.rand(1, 3, 252, 252))[0]
+    output.mean().backward()
+    assert model.layer["b1"]["conv1"][0].weight.grad is not None
+
+
+def test_compile_tensorrt_invalid_precision():
+    """Test compile_tensorrt rejects unsupported precisions."""
+    model = MicroNet()
+    with pytest.raises(ValueError, match="fp16"):
+        model.compile_tensorrt(torch.rand(1, 3, 252, 252), precision="int8")
+
+
 @pytest.mark.skipif(
     toolbox_env.running_on_travis() or not toolbox_env.has_gpu(),
     reason="Local test on machine with GPU.",
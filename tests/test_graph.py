@@ -4,6 +4,7 @@ import numpy as np
 import pytest
 import torch
 from matplotlib import pyplot as plt
+from scipy.sparse import csr_matrix, issparse
 
 from tiatoolbox.tools.graph import (
     SlideGraphConstructor,
@@ -70,6 +71,59 @@ def test_delaunay_adjacency_connected():
     assert np.sum(adjacency_matrix) / 2 == 1
 
 
+def test_delaunay_adjacency_sparse_output():
+    """Test delaunay_adjacency returns a symmetric sparse matrix."""
+    np.random.seed(123)
+    points = np.random.rand(100, 2)
+    adjacency_matrix = delaunay_adjacency(points=points, dthresh=0.5)
+    assert issparse(adjacency_matrix)
+    assert adjacency_matrix.shape == (100, 100)
+    # Adjacency should be symmetric
+    assert (adjacency_matrix != adjacency_matrix.T).nnz == 0
+
+
+def test_affinity_to_edge_index_sparse_dense_agree():
+    """Test that sparse and dense inputs give the same edge index."""
+    np.random.seed(123)
+    affinity_matrix = np.random.sample((10, 10))
+    threshold = 0.7
+    dense_edges = affinity_to_edge_index(affinity_matrix, threshold=threshold)
+    sparse_edges = affinity_to_edge_index(
+        csr_matrix(affinity_matrix), threshold=threshold
+    )
+    assert np.array_equal(dense_edges, sparse_edges)
+
+
+def test_affinity_to_edge_index_symmetric():
+    """Test that symmetric=True returns each undirected edge once.
+
+    For a symmetric affinity matrix, the edges found with
+    symmetric=True should be exactly the i < j half of the edges found
+    with the default (directed) scan, for each of the dense, sparse,
+    and torch input types.
+
+    """
+    np.random.seed(123)
+    affinity_matrix = np.random.sample((10, 10))
+    affinity_matrix = np.maximum(affinity_matrix, affinity_matrix.T)
+    np.fill_diagonal(affinity_matrix, 0)
+    threshold = 0.7
+    inputs = [
+        affinity_matrix,
+        csr_matrix(affinity_matrix),
+        torch.tensor(affinity_matrix),
+    ]
+    for matrix in inputs:
+        full = np.asarray(affinity_to_edge_index(matrix, threshold=threshold))
+        half = np.asarray(
+            affinity_to_edge_index(matrix, threshold=threshold, symmetric=True)
+        )
+        assert np.all(half[0] < half[1])
+        expected = {(i, j) for i, j in full.T if i < j}
+        assert {(i, j) for i, j in half.T} == expected
+        assert half.shape[1] * 2 == full.shape[1]
+
+
 def test_affinity_to_edge_index_fuzz_output_shape():
     """Fuzz test that output shape is 2xM for affinity_to_edge.
 
@@ -32,11 +32,80 @@ import umap
 from matplotlib import pyplot as plt
 from matplotlib.axes import Axes
 from numpy.typing import ArrayLike
-from scipy.cluster import hierarchy
+from scipy.sparse import csr_matrix, issparse
+from scipy.sparse.csgraph import connected_components
 from scipy.spatial import Delaunay, cKDTree
 
+try:
+    from numba import njit, prange
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _similarity_kernel_jit(
+        pairs, pair_distances, features, lambda_d, lambda_f
+    ):  # pragma: no cover
+        similarities = np.empty(pairs.shape[0], dtype=features.dtype)
+        for k in prange(pairs.shape[0]):
+            i = pairs[k, 0]
+            j = pairs[k, 1]
+            squared_feature_distance = 0.0
+            for dim in range(features.shape[1]):
+                difference = features[i, dim] - features[j, dim]
+                squared_feature_distance += difference * difference
+            similarities[k] = 1.0 - np.exp(
+                -lambda_f * np.sqrt(squared_feature_distance)
+            ) * np.exp(-lambda_d * pair_distances[k])
+        return similarities
+
+except ImportError:  # numba is an optional acceleration
+    _similarity_kernel_jit = None
+
+
+def _pair_similarities(
+    pairs: ArrayLike,
+    pair_distances: ArrayLike,
+    features: ArrayLike,
+    lambda_d: Number,
+    lambda_f: Number,
+) -> ArrayLike:
+    """Compute the pairwise similarity kernel 1 - exp(-lf*f)exp(-ld*d).
+
+    Here f and d are the feature-space and spatial euclidean distances
+    between the two points of each pair (1 = most un-similar, 0 = most
+    similar). Uses a parallel numba JIT kernel when numba is installed,
+    which fuses the feature norm and exponentials without allocating
+    intermediate arrays, and an equivalent vectorised NumPy
+    implementation otherwise.
 
-def delaunay_adjacency(points: ArrayLike, dthresh: Number) -> list:
+    Args:
+        pairs (ArrayLike):
+            An Mx2 array of point index pairs.
+        pair_distances (ArrayLike):
+            An M long array of spatial distances for each pair.
+        features (ArrayLike):
+            An NxF array of features for each point.
+        lambda_d (Number):
+            Spatial distance (d) weighting.
+        lambda_f (Number):
+            Feature distance (f) weighting.
+
+    Returns:
+        ArrayLike:
+            An M long array of pair similarities.
+
+    """
+    if _similarity_kernel_jit is not None:
+        return _similarity_kernel_jit(
+            pairs, pair_distances, features, float(lambda_d), float(lambda_f)
+        )
+    pair_feature_distances = np.linalg.norm(
+        features[pairs[:, 0]] - features[pairs[:, 1]], axis=1
+    )
+    return 1 - (
+        np.exp(-lambda_f * pair_feature_distances) * np.exp(-lambda_d * pair_distances)
+    )
+
+
+def delaunay_adjacency(points: ArrayLike, dthresh: Number) -> csr_matrix:
     """Create an adjacency matrix via Delaunay triangulation from a list of coordinates.
 
     Points which are further apart than dthresh will not be connected.
@@ -50,9 +119,9 @@ def delaunay_adjacency(points: ArrayLike, dthresh: Number) -> list:
             Distance threshold for triangulation.
 
     Returns:
-        ArrayLike:
-            Adjacency matrix of shape NxN where 1 indicates connected
-            and 0 indicates unconnected.
+        :class:`scipy.sparse.csr_matrix`:
+            Sparse adjacency matrix of shape NxN where 1 indicates
+            connected and 0 (implicit) indicates unconnected.
 
     Example:
         >>> points = np.random.rand(100, 2)
@@ -69,33 +138,41 @@ def delaunay_adjacency(points: ArrayLike, dthresh: Number) -> list:
     # Apply Delaunay triangulation to the coordinates to get a
     # tessellation of triangles.
     tessellation = Delaunay(points)
-    # Find all connected neighbours for each point in the set of
-    # triangles. Starting with an empty dictionary.
-    triangle_neighbours = defaultdict(set)
-    # Iterate over each triplet of point indexes which denotes a
-    # triangle within the tessellation.
-    for index_triplet in tessellation.simplices:
-        for index in index_triplet:
-            connected = set(index_triplet)
-            connected.remove(index)  # Do not allow connection to itself.
-            triangle_neighbours[index] = triangle_neighbours[index].union(connected)
-    # Initialise the nxn adjacency matrix with zeros.
-    adjacency = np.zeros((len(points), len(points)))
-    # Fill the adjacency matrix:
-    for index in triangle_neighbours:
-        neighbours = triangle_neighbours[index]
-        neighbours = np.array(list(neighbours), dtype=int)
-        kdtree = cKDTree(points[neighbours, :])
-        nearby_neighbours = kdtree.query_ball_point(
-            x=points[index],
-            r=dthresh,
-        )
-        neighbours = neighbours[nearby_neighbours]
-        adjacency[index, neighbours] = 1.0
-        adjacency[neighbours, index] = 1.0
+    # Derive the candidate edges directly from the triplets of point
+    # indexes (simplices) which denote each triangle within the
+    # tessellation. Each triangle contributes its three edges.
+    simplices = tessellation.simplices
+    edges = np.concatenate(
+        (simplices[:, [0, 1]], simplices[:, [1, 2]], simplices[:, [0, 2]]),
+        axis=0,
+    )
+    # Canonicalise the edges so that (i, j) and (j, i) are the same edge
+    # and remove duplicates shared between adjacent triangles. Each
+    # edge is encoded as a single integer i*N + j so that the
+    # deduplication is a plain 1-D unique (one C-level sort) rather
+    # than a slower lexicographic row sort with np.unique(axis=0).
+    edges = np.sort(edges, axis=1)
+    flat_edges = np.unique(edges[:, 0].astype(np.int64) * len(points) + edges[:, 1])
+    edges = np.stack(divmod(flat_edges, len(points)), axis=1)
+    # Keep only edges which are no longer than dthresh (compared in the
+    # squared domain to avoid the square root).
+    squared_distances = np.sum((points[edges[:, 0]] - points[edges[:, 1]]) ** 2, axis=1)
+    edges = edges[squared_distances <= dthresh**2]
+    # Build the nxn adjacency matrix symmetrically from the edge list.
+    # Delaunay adjacency is O(N)-sparse (~6 neighbours per point in
+    # 2-D), so a sparse matrix avoids the O(N^2) dense allocation.
     # Return neighbours of each coordinate as an affinity (adjacency
     # in this case) matrix.
-    return adjacency
+    return csr_matrix(
+        (
+            np.ones(2 * len(edges)),
+            (
+                np.concatenate((edges[:, 0], edges[:, 1])),
+                np.concatenate((edges[:, 1], edges[:, 0])),
+            ),
+        ),
+        shape=(len(points), len(points)),
+    )
 
 
 def triangle_signed_area(triangle: ArrayLike) -> int:
@@ -169,6 +246,7 @@ def edge_index_to_triangles(edge_index: ArrayLike) -> ArrayLike:
 def affinity_to_edge_index(
     affinity_matrix: Union[torch.Tensor, ArrayLike],
     threshold: Number = 0.5,
+    symmetric: bool = False,
 ) -> Union[torch.tensor, ArrayLike]:
     """Convert an affinity matrix (similarity matrix) to an edge index.
 
@@ -178,10 +256,16 @@ def affinity_to_edge_index(
 
     Args:
         affinity_matrix:
-            An NxN matrix of affinities between nodes.
+            An NxN matrix of affinities between nodes. May be a dense
+            array, a scipy sparse matrix, or a torch tensor.
         threshold (Number):
             Threshold above which to be considered connected. Defaults
             to 0.5.
+        symmetric (bool):
+            Whether the affinity matrix is symmetric (an undirected
+            graph). If True, only the upper triangle is scanned and
+            each edge is returned once with i < j, halving the work.
+            Defaults to False.
 
     Returns:
         ArrayLike or torch.Tensor:
@@ -194,21 +278,37 @@ def affinity_to_edge_index(
 
     """
     # Validate inputs
-    input_shape = np.shape(affinity_matrix)
+    input_shape = (
+        affinity_matrix.shape
+        if issparse(affinity_matrix)
+        else np.shape(affinity_matrix)
+    )
     if len(input_shape) != 2 or len(np.unique(input_shape)) != 1:
         raise ValueError("Input affinity_matrix must be square (NxN).")
-    # Handle cases for pytorch and numpy inputs
+    # Handle cases for scipy sparse, pytorch, and numpy inputs
+    if issparse(affinity_matrix):
+        coo = affinity_matrix.tocoo()
+        over_threshold = coo.data > threshold
+        if symmetric:
+            over_threshold &= coo.row < coo.col
+        return np.ascontiguousarray(
+            np.stack((coo.row[over_threshold], coo.col[over_threshold]))
+        )
     if isinstance(affinity_matrix, torch.Tensor):
-        return (affinity_matrix > threshold).nonzero().t().contiguous()
-    return np.ascontiguousarray(
-        np.stack((affinity_matrix > threshold).nonzero(), axis=1).T
-    )
+        connected = affinity_matrix > threshold
+        if symmetric:
+            connected = torch.triu(connected, diagonal=1)
+        return connected.nonzero().t().contiguous()
+    connected = affinity_matrix > threshold
+    if symmetric:
+        connected = np.triu(connected, k=1)
+    return np.ascontiguousarray(np.argwhere(connected).T)
 
 
 class SlideGraphConstructor:  # noqa: PIE798
     """Construct a graph using the SlideGraph+ (Liu et al. 2021) method.
 
-    This uses a hybrid agglomerative clustering which uses a weighted
+    This uses a hybrid single-linkage clustering which uses a weighted
     combination of spatial distance (within the WSI) and feature-space
     distance to group patches into nodes. See the `build` function for
     more details on the graph construction method.
@@ -265,7 +365,8 @@ class SlideGraphConstructor:  # noqa: PIE798
         `neighbour_search_radius` are given a similarity of 1 (most
         dissimilar). This significantly speeds up computation. This
         distance metric is then used to form clusters via
-        hierarchical/agglomerative clustering.
+        single-linkage clustering, i.e. by thresholding the similarity
+        graph at `lambda_h` and finding its connected components.
 
         Next, a Delaunay triangulation is applied to the clusters to
         connect the neighouring clusters. Only clusters which are closer
@@ -329,81 +430,70 @@ class SlideGraphConstructor:  # noqa: PIE798
             >>> graph_dict = SlideGraphConstructor.build(points, features)
 
         """
+        # Use float32 for the distance and similarity maths: WSI
+        # coordinates and CNN features fit comfortably within float32
+        # range and halving the bandwidth speeds up the memory-bound
+        # kernel evaluation.
+        points = np.ascontiguousarray(points, dtype=np.float32)
+        features = np.ascontiguousarray(features, dtype=np.float32)
+
         # Remove features which do not change significantly between patches
         if feature_range_thresh:
             feature_ranges = np.max(features, axis=0) - np.min(features, axis=0)
             where_significant = feature_ranges > feature_range_thresh
             features = features[:, where_significant]
 
-        # Build a kd-tree and rank neighbours according to the euclidean
-        # distance (nearest -> farthest).
+        # Build a kd-tree and find all pairs of points which are within
+        # the neighbour search radius of each other, along with their
+        # euclidean distances. Only the upper triangle (i < j) of the
+        # symmetric sparse distance matrix is kept, giving an Mx2 array
+        # of point indexes and an M long array of distances.
         kd_tree = cKDTree(points)
-        neighbour_distances_ckd, neighbour_indexes_ckd = kd_tree.query(
-            x=points, k=len(points)
+        sparse_distances = kd_tree.sparse_distance_matrix(
+            kd_tree, neighbour_search_radius, output_type="coo_matrix"
+        )
+        upper_triangle = sparse_distances.row < sparse_distances.col
+        pair_rows = sparse_distances.row[upper_triangle]
+        pair_cols = sparse_distances.col[upper_triangle]
+        pairs = np.stack((pair_rows, pair_cols), axis=1)
+        pair_distances = sparse_distances.data[upper_triangle].astype(np.float32)
+
+        # 1 - product of similarities (1 - fd), where f and d are the
+        # feature and distance similarity kernels from the paper
+        # (1 = most un-similar 0 = most similar).
+        pair_similarities = _pair_similarities(
+            pairs, pair_distances, features, lambda_d, lambda_f
         )
 
-        # Initialise an empty 1-D condensed distance matrix.
-        # For information on condensed distance matrices see:
-        # noqa - https://docs.scipy.org/doc/scipy/reference/generated/scipy.spatial.distance.pdist
-        # noqa - https://docs.scipy.org/doc/scipy/reference/generated/scipy.cluster.hierarchy.linkage.html
-        condensed_distance_matrix = np.zeros(int(len(points) * (len(points) - 1) / 2))
-
-        # Find the similarity between pairs of patches
-        index = 0
-        for i in range(len(points) - 1):
-            # Only consider neighbours which are inside of the radius
-            # (neighbour_search_radius).
-            neighbour_distances_singlepoint = neighbour_distances_ckd[i][
-                neighbour_distances_ckd[i] < neighbour_search_radius
-            ]
-            neighbour_indexes_singlepoint = neighbour_indexes_ckd[i][
-                : len(neighbour_distances_singlepoint)
-            ]
-
-            # Called f in the paper
-            neighbour_feature_similarities = np.exp(
-                -lambda_f
-                * np.linalg.norm(
-                    features[i] - features[neighbour_indexes_singlepoint], axis=1
-                )
-            )
-            # Called d in paper
-            neighbour_distance_similarities = np.exp(
-                -lambda_d * neighbour_distances_singlepoint
-            )
-            # 1 - product of similarities (1 - fd)
-            # (1 = most un-similar 0 = most similar)
-            neighbour_similarities = (
-                1 - neighbour_feature_similarities * neighbour_distance_similarities
-            )
-            # Initialise similarity of coordinate i vs all coordinates to 1
-            # (most un-similar).
-            i_vs_all_similarities = np.ones(len(points))
-            # Set the neighbours similarity to calculated values (similarity/fd)
-            i_vs_all_similarities[
-                neighbour_indexes_singlepoint
-            ] = neighbour_similarities
-            i_vs_all_similarities = i_vs_all_similarities[i + 1 :]
-            condensed_distance_matrix[
-                index : index + len(i_vs_all_similarities)
-            ] = i_vs_all_similarities
-            index = index + len(i_vs_all_similarities)
-
-        # Perform hierarchical clustering (using similarity as distance)
-        linkage_matrix = hierarchy.linkage(condensed_distance_matrix, method="average")
-        clusters = hierarchy.fcluster(linkage_matrix, lambda_h, criterion="distance")
+        # Cluster by thresholding the similarity graph and finding its
+        # connected components (single-linkage clustering at the cut
+        # distance lambda_h). Pairs outside of the search radius have an
+        # implicit similarity of 1 (most un-similar) and are therefore
+        # never clustered together. This avoids materialising the full
+        # O(N^2) condensed distance matrix which hierarchical clustering
+        # would require.
+        connected_pairs = pairs[pair_similarities < lambda_h]
+        adjacency = csr_matrix(
+            (
+                np.ones(len(connected_pairs)),
+                (connected_pairs[:, 0], connected_pairs[:, 1]),
+            ),
+            shape=(len(points), len(points)),
+        )
+        _, clusters = connected_components(adjacency, directed=False)
 
         # Finding the xy centroid and average features for each cluster
-        unique_clusters = list(set(clusters))
-        point_centroids = []
-        feature_centroids = []
-        for c in unique_clusters:
-            (idx,) = np.where(clusters == c)
-            # Find the xy and feature space averages of the cluster
-            point_centroids.append(np.round(points[idx, :].mean(axis=0)))
-            feature_centroids.append(features[idx, :].mean(axis=0))
-        point_centroids = np.array(point_centroids)
-        feature_centroids = np.array(feature_centroids)
+        # with a single grouped-reduction pass. Relabelling the clusters
+        # to 0..K-1 lets the per-cluster sums be accumulated in C via
+        # np.add.at and divided by the cluster sizes in one go.
+        unique_clusters, cluster_indexes = np.unique(clusters, return_inverse=True)
+        cluster_sizes = np.bincount(cluster_indexes).astype(np.float64)
+        point_sums = np.zeros((len(unique_clusters), points.shape[1]))
+        np.add.at(point_sums, cluster_indexes, points)
+        point_centroids = np.round(point_sums / cluster_sizes[:, None])
+        feature_sums = np.zeros((len(unique_clusters), features.shape[1]))
+        np.add.at(feature_sums, cluster_indexes, features)
+        feature_centroids = feature_sums / cluster_sizes[:, None]
 
         adjacency_matrix = delaunay_adjacency(
             points=point_centroids,